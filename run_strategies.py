@@ -1,13 +1,18 @@
 # run_strategies.py
 from __future__ import annotations
-from typing import List, Optional
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
 
 from supabase_client import supabase
 from strategies import build_combined_strategies
-from strategies.base import Candle
+from strategies.base import BaseStrategy, CandleArrays, TechContext
 
 
-def fetch_candles_from_db(symbol: str, timeframe: str = "1D") -> List[Candle]:
+def fetch_candles_from_db(symbol: str, timeframe: str = "1D") -> CandleArrays:
     resp = (
         supabase.table("candles")
         .select("time, open, high, low, close, volume")
@@ -17,12 +22,76 @@ def fetch_candles_from_db(symbol: str, timeframe: str = "1D") -> List[Candle]:
         .limit(300)
         .execute()
     )
-    data = resp.data or []
-    data.reverse()  # oud -> nieuw
-    return data  # type: ignore[return-value]
+    # DB levert nieuw -> oud (voor de limit); omdraaien gebeurt tijdens het vullen
+    return CandleArrays.from_rows(resp.data or [], newest_first=True)
+
+
+# Max. aantal rijen per insert-request naar de signals tabel.
+INSERT_CHUNK_SIZE = 500
+
+# Max. aantal symbols dat tegelijk verwerkt wordt.
+DEFAULT_MAX_CONCURRENCY = 50
+
+# Lookup-caches: symbol -> asset_id en slug -> strategy_id.
+# Worden per run in één keer gevuld door load_id_caches().
+_asset_ids: Dict[str, str] = {}
+_strategy_ids: Dict[str, str] = {}
+
+# Keys waarvan al vaststaat dat ze niet bestaan, zodat we ze niet
+# per symbol opnieuw opvragen.
+_missing_assets: Set[str] = set()
+_missing_strategies: Set[str] = set()
+
+
+def load_id_caches(symbols: List[str], slugs: List[str]) -> None:
+    """
+    Haalt alle asset- en strategy-id's in twee queries op,
+    i.p.v. één query per symbol/strategie.
+    """
+    if symbols:
+        resp = (
+            supabase.table("assets")
+            .select("id, symbol")
+            .in_("symbol", symbols)
+            .execute()
+        )
+        _asset_ids.update({row["symbol"]: row["id"] for row in resp.data or []})
+        for symbol in set(symbols) - _asset_ids.keys():
+            _missing_assets.add(symbol)
+            print(f"[WARN] Geen asset gevonden voor symbol={symbol} in 'assets' tabel")
+
+    if slugs:
+        resp = (
+            supabase.table("strategies")
+            .select("id, slug")
+            .in_("slug", slugs)
+            .execute()
+        )
+        _strategy_ids.update({row["slug"]: row["id"] for row in resp.data or []})
+        for slug in set(slugs) - _strategy_ids.keys():
+            _missing_strategies.add(slug)
+            print(f"[WARN] Geen strategy gevonden voor slug={slug} in 'strategies' tabel")
+
+
+def clear_id_caches() -> None:
+    """
+    Leegt de lookup-caches, bv. voor een langlopend proces waarin
+    assets of strategieën tussen runs kunnen wijzigen.
+    """
+    _asset_ids.clear()
+    _strategy_ids.clear()
+    _missing_assets.clear()
+    _missing_strategies.clear()
 
 
 def get_asset_id(symbol: str) -> Optional[str]:
+    asset_id = _asset_ids.get(symbol)
+    if asset_id:
+        return asset_id
+    if symbol in _missing_assets:
+        return None
+
+    # niet voorgeladen: los opvragen en onthouden
     resp = (
         supabase.table("assets")
         .select("id")
@@ -33,11 +102,20 @@ def get_asset_id(symbol: str) -> Optional[str]:
     rows = resp.data or []
     if not rows:
         print(f"[WARN] Geen asset gevonden voor symbol={symbol} in 'assets' tabel")
+        _missing_assets.add(symbol)
         return None
+    _asset_ids[symbol] = rows[0]["id"]
     return rows[0]["id"]
 
 
 def get_strategy_id(slug: str) -> Optional[str]:
+    strategy_id = _strategy_ids.get(slug)
+    if strategy_id:
+        return strategy_id
+    if slug in _missing_strategies:
+        return None
+
+    # niet voorgeladen: los opvragen en onthouden
     resp = (
         supabase.table("strategies")
         .select("id")
@@ -48,7 +126,9 @@ def get_strategy_id(slug: str) -> Optional[str]:
     rows = resp.data or []
     if not rows:
         print(f"[WARN] Geen strategy gevonden voor slug={slug} in 'strategies' tabel")
+        _missing_strategies.add(slug)
         return None
+    _strategy_ids[slug] = rows[0]["id"]
     return rows[0]["id"]
 
 
@@ -60,19 +140,36 @@ def normalize_signal_type(signal_type: str) -> str:
     return "BUY" if signal_type == "BUY" else "HOLD"
 
 
-def run_for_asset(symbol: str, timeframe: str = "1D"):
+def run_for_asset(
+    symbol: str,
+    strategies: List[BaseStrategy],
+    timeframe: str = "1D",
+) -> List[Dict[str, Any]]:
+    """
+    Draait alle strategieën voor één symbol en geeft de signal-payloads terug.
+    Het wegschrijven gebeurt in bulk door run_for_universe().
+    """
+    payloads: List[Dict[str, Any]] = []
+
     candles = fetch_candles_from_db(symbol, timeframe)
     if not candles:
         print(f"[WARN] Geen candles voor {symbol}")
-        return
+        return payloads
+
+    # close/high worden door de strategieën gelezen; een NULL daarin (NaN)
+    # zou als NaN in price/meta belanden en de hele insert laten falen
+    if np.isnan(candles.close).any() or np.isnan(candles.high).any():
+        print(f"[WARN] Skip {symbol} omdat close/high NULL-waarden bevat")
+        return payloads
 
     asset_id = get_asset_id(symbol)
     if not asset_id:
         print(f"[WARN] Skip {symbol} omdat er geen asset_id is")
-        return
+        return payloads
 
-    last_candle = candles[-1]
-    strategies = build_combined_strategies()
+    # Indicatoren en nieuws worden één keer per symbol berekend en gedeeld door alle combinaties
+    ctx = TechContext(candles)
+    last_candle = candles.last()
 
     for strat in strategies:
         if strat.timeframe != timeframe:
@@ -88,29 +185,101 @@ def run_for_asset(symbol: str, timeframe: str = "1D"):
             print(f"[WARN] Skip strategie {strategy_slug} omdat er geen strategy_id is")
             continue
 
-        res = strat.generate_signal(symbol, candles)
+        res = strat.generate_signal(symbol, ctx)
         signal_type = normalize_signal_type(res["signal_type"])
 
         payload = {
             "asset_id": asset_id,
             "strategy_id": strategy_id,
             "signal_type": signal_type,        # ALTIJD BUY of HOLD
-            "price": last_candle["close"],
+            "price": last_candle.close,
             "timeframe": strat.timeframe,
-            "generated_at": last_candle["time"],
-            "meta": res["extra"],              # extra info in meta jsonb
+            "generated_at": last_candle.time,
+            "meta": strat.round_meta(res["extra"]),  # extra info in meta jsonb
         }
 
-        supabase.table("signals").insert(payload).execute()
-        print(f"[OK] {symbol} - {strategy_slug} -> {signal_type} ({res['confidence']})")
+        payloads.append(payload)
+        print(f"[OK] {symbol} - {strategy_slug} -> {signal_type} ({res['confidence']:.3f})")
+
+    return payloads
 
 
-def run_for_universe(symbols: List[str]):
-    for symbol in symbols:
-        run_for_asset(symbol)
+def insert_signals(payloads: List[Dict[str, Any]], chunk_size: int = INSERT_CHUNK_SIZE) -> int:
+    """
+    Schrijft signals weg met één array-insert per chunk,
+    zodat we onder de body-limiet van PostgREST blijven.
+    Een mislukte chunk wordt gelogd en overgeslagen; geeft het aantal
+    daadwerkelijk weggeschreven rijen terug.
+    """
+    written = 0
+    for start in range(0, len(payloads), chunk_size):
+        rows = payloads[start:start + chunk_size]
+        try:
+            supabase.table("signals").insert(rows).execute()
+        except Exception as e:
+            print(f"[ERROR] Insert van signals {start}-{start + len(rows) - 1} mislukt: {e!r}")
+            continue
+        written += len(rows)
+    return written
+
+
+async def run_for_asset_async(
+    symbol: str,
+    strategies: List[BaseStrategy],
+    executor: ThreadPoolExecutor,
+) -> List[Dict[str, Any]]:
+    """
+    supabase-py is synchroon; het werk per symbol draait daarom in een thread
+    uit een eigen pool, waarvan max_workers de concurrency begrenst.
+    Een fout bij één symbol wordt gelogd en kost niet de signals van de rest.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(executor, run_for_asset, symbol, strategies)
+    except Exception as e:
+        print(f"[ERROR] {symbol} overgeslagen: {e!r}")
+        return []
+
+
+async def _run_for_universe_async(
+    symbols: List[str],
+    strategies: List[BaseStrategy],
+    max_concurrency: int,
+) -> List[Dict[str, Any]]:
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        results = await asyncio.gather(
+            *[run_for_asset_async(symbol, strategies, executor) for symbol in symbols]
+        )
+    return [payload for payloads in results for payload in payloads]
+
+
+def run_for_universe(symbols: List[str], max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+    strategies = build_combined_strategies()
+    load_id_caches(symbols, [s.code for s in strategies])
+
+    payloads = asyncio.run(_run_for_universe_async(symbols, strategies, max_concurrency))
+
+    written = insert_signals(payloads)
+    print(f"[OK] {written}/{len(payloads)} signals weggeschreven")
+
+
+def _positive_int(value: str) -> int:
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"moet minimaal 1 zijn, niet {value}")
+    return n
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Draai de combinatie-strategieën voor een lijst symbols")
+    parser.add_argument(
+        "--max_concurrency",
+        type=_positive_int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help="max. aantal symbols dat tegelijk verwerkt wordt",
+    )
+    args = parser.parse_args()
+
     # Voor nu alleen AAPL, omdat we daar candles + asset voor hebben
     symbols = ["AAPL"]
-    run_for_universe(symbols)
+    run_for_universe(symbols, max_concurrency=args.max_concurrency)
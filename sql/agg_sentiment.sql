@@ -0,0 +1,28 @@
+-- sql/agg_sentiment.sql
+-- Gewogen nieuws-sentiment per symbol, server-side berekend.
+-- Zelfde weging als NewsSentimentStrategy._aggregate_sentiment:
+--   w = impact * greatest(0.1, 1 / (1 + hours_ago / 8))
+-- Aangeroepen via supabase.rpc("agg_sentiment", {"sym": ..., "hours": ...}).
+
+create or replace function public.agg_sentiment(sym text, hours integer)
+returns table (avg_sentiment double precision, articles_count integer)
+language sql
+stable
+as $$
+    with recent as (
+        select
+            coalesce(sentiment_score, 0)::double precision as s,
+            coalesce(nullif(impact_score, 0), 0.5)::double precision
+                * greatest(
+                    0.1,
+                    1.0 / (1.0 + extract(epoch from (now() - published_at))::double precision / 3600.0 / 8.0)
+                ) as w
+        from news_articles
+        where symbol = agg_sentiment.sym
+          and published_at >= now() - make_interval(hours => agg_sentiment.hours)
+    )
+    select
+        coalesce(sum(s * w) / nullif(sum(w), 0), 0)::double precision,
+        count(*)::integer
+    from recent;
+$$;
@@ -0,0 +1,21 @@
+# strategies/_njit.py
+"""
+numba is optioneel: zonder numba wordt njit een no-op decorator
+en draaien de kernels als gewone Python.
+"""
+from __future__ import annotations
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - afhankelijk van de omgeving
+    def njit(*args, **kwargs):
+        # ondersteunt zowel @njit als @njit(cache=True)
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
+
+__all__ = ["njit"]
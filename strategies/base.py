@@ -1,9 +1,25 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import TypedDict, Dict, Any, List
+from dataclasses import dataclass, field
+from typing import TypedDict, ClassVar, Dict, Any, Iterator, List, Tuple
 
+import numpy as np
 
-class Candle(TypedDict):
+from .indicators import compute_rsi
+
+
+class CandleRow(TypedDict):
+    """Eén candle zoals de candles-tabel hem levert (alleen het wire-formaat)."""
+    time: str         # ISO string, bv "2025-11-29T18:21:03Z"
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+@dataclass(frozen=True, slots=True)
+class Candle:
     time: str         # ISO string, bv "2025-11-29T18:21:03Z"
     open: float
     high: float
@@ -12,6 +28,111 @@ class Candle(TypedDict):
     volume: float
 
 
+@dataclass
+class CandleArrays:
+    """
+    Candles als struct-of-arrays (oud -> nieuw), één contigue float64-array per veld.
+    Wordt één keer per symbol opgebouwd en gedeeld door alle strategieën.
+    """
+    time: List[str]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def last(self) -> Candle:
+        return Candle(
+            time=self.time[-1],
+            open=float(self.open[-1]),
+            high=float(self.high[-1]),
+            low=float(self.low[-1]),
+            close=float(self.close[-1]),
+            volume=float(self.volume[-1]),
+        )
+
+    @classmethod
+    def from_rows(cls, rows: List[CandleRow], newest_first: bool = False) -> "CandleArrays":
+        """
+        Bouwt de arrays op uit DB-rijen. Met newest_first=True wordt de volgorde
+        tijdens het vullen omgedraaid, zodat er geen aparte reverse-pass nodig is.
+        """
+        n = len(rows)
+
+        def ordered() -> Iterator[CandleRow]:
+            return reversed(rows) if newest_first else iter(rows)
+
+        def column(key: str) -> np.ndarray:
+            # NULL (bv. volume bij index/FX candles) wordt NaN i.p.v. een TypeError
+            values = (np.nan if row[key] is None else row[key] for row in ordered())
+            return np.fromiter(values, dtype=np.float64, count=n)
+
+        return cls(
+            time=[row["time"] for row in ordered()],
+            open=column("open"),
+            high=column("high"),
+            low=column("low"),
+            close=column("close"),
+            volume=column("volume"),
+        )
+
+
+@dataclass
+class TechContext:
+    """
+    Technische context per symbol, één keer opgebouwd in run_for_asset en
+    gedeeld door alle combinaties. Indicatoren worden per (naam, periode)
+    maar één keer berekend; nieuws per news-strategie, pas als een combinatie
+    erom vraagt.
+    """
+    candles: CandleArrays
+    _cache: Dict[Tuple[str, int], float] = field(default_factory=dict, repr=False)
+    _news: Dict[int, StrategyResult] = field(default_factory=dict, repr=False)
+
+    def news(self, news_strategy: BaseStrategy, symbol: str) -> StrategyResult:
+        key = id(news_strategy)
+        if key not in self._news:
+            self._news[key] = news_strategy.generate_signal(symbol, self)
+        return self._news[key]
+
+    @property
+    def close(self) -> float:
+        return float(self.candles.close[-1])
+
+    def rsi(self, period: int) -> float:
+        key = ("rsi", period)
+        if key not in self._cache:
+            self._cache[key] = compute_rsi(self.candles.close, period)
+        return self._cache[key]
+
+    def ma(self, period: int) -> float:
+        key = ("ma", period)
+        if key not in self._cache:
+            self._cache[key] = float(self.candles.close[-period:].mean())
+        return self._cache[key]
+
+    def highest_high(self, lookback: int) -> float:
+        """Hoogste high over `lookback` candles vóór de laatste candle."""
+        key = ("highest_high", lookback)
+        if key not in self._cache:
+            self._cache[key] = float(self.candles.high[:-1][-lookback:].max())
+        return self._cache[key]
+
+    def recent_high(self, window: int) -> float:
+        """Hoogste close over de laatste `window` candles (inclusief de laatste)."""
+        key = ("recent_high", window)
+        if key not in self._cache:
+            self._cache[key] = float(self.candles.close[-window:].max())
+        return self._cache[key]
+
+
+# Aantal decimalen voor "confidence" in opgeslagen resultaten
+CONFIDENCE_NDIGITS = 3
+
+
 class StrategyResult(TypedDict):
     signal_type: str          # "BUY" of "HOLD"
     confidence: float         # 0..1
@@ -19,10 +140,30 @@ class StrategyResult(TypedDict):
 
 
 class BaseStrategy(ABC):
+    __slots__ = ()
+
     code: str
     name: str
     timeframe: str = "1D"
 
+    # Decimalen per eigen extra-veld bij het wegschrijven. Strategieën rekenen
+    # ongerond; velden die hier niet staan (zoals prijzen) blijven ongewijzigd.
+    meta_ndigits: ClassVar[Dict[str, int]] = {}
+
     @abstractmethod
-    def generate_signal(self, symbol: str, candles: List[Candle]) -> StrategyResult:
+    def generate_signal(self, symbol: str, ctx: TechContext) -> StrategyResult:
         ...
+
+    def round_meta(self, extra: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            key: round(value, self.meta_ndigits[key])
+            if key in self.meta_ndigits and isinstance(value, float) else value
+            for key, value in extra.items()
+        }
+
+    def round_result(self, res: StrategyResult) -> StrategyResult:
+        return {
+            **res,
+            "confidence": round(res["confidence"], CONFIDENCE_NDIGITS),
+            "extra": self.round_meta(res["extra"]),
+        }
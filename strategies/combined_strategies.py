@@ -1,16 +1,32 @@
 from __future__ import annotations
-from typing import List
+from typing import Any, Dict, Final
 
-from .base import BaseStrategy, StrategyResult, Candle
-from .indicators import compute_rsi, simple_ma, highest_high
+from .base import BaseStrategy, StrategyResult, TechContext
 from .news_sentiment import NewsSentimentStrategy
 
+# Weging techniek vs. nieuws, gedeeld door alle combinaties
+_TECH_W_BASE: Final = 0.7
+_NEWS_W_BASE: Final = 0.3
+_NEWS_CONF_FLOOR: Final = 0.2
+_BUY_THRESHOLD: Final = 0.35
+
+
+def _with_rounded_news(news_strategy: NewsSentimentStrategy, extra: Dict[str, Any]) -> Dict[str, Any]:
+    news_res = extra.get("news")
+    if news_res is None:
+        return extra
+    return {**extra, "news": news_strategy.round_result(news_res)}
+
 
 class NewsRSICombo(BaseStrategy):
     code = "NEWS_RSI_COMBO"
     name = "News + RSI Mean Reversion"
     timeframe = "1D"
 
+    __slots__ = ("news_strategy", "rsi_period", "oversold")
+
+    meta_ndigits = {"normalized_score": 3, "rsi": 2}
+
     def __init__(
         self,
         news_strategy: NewsSentimentStrategy,
@@ -21,50 +37,56 @@ class NewsRSICombo(BaseStrategy):
         self.rsi_period = rsi_period
         self.oversold = oversold
 
-    def generate_signal(self, symbol: str, candles: List[Candle]) -> StrategyResult:
-        if len(candles) < self.rsi_period + 1:
+    def generate_signal(self, symbol: str, ctx: TechContext) -> StrategyResult:
+        if len(ctx.candles) < self.rsi_period + 1:
             return {
                 "signal_type": "HOLD",
                 "confidence": 0.1,
                 "extra": {"reason": "not_enough_candles"},
             }
 
-        closes = [c["close"] for c in candles]
-        rsi = compute_rsi(closes, self.rsi_period)
+        rsi = ctx.rsi(self.rsi_period)
         tech_buy = rsi < self.oversold  # alleen oversold → BUY-kans
 
-        news_res = self.news_strategy.generate_signal(symbol, candles)
+        news_res = ctx.news(self.news_strategy, symbol)
         avg_sentiment = float(news_res["extra"].get("avg_sentiment", 0.0))
 
         tech_score = 1.0 if tech_buy else 0.0
         news_score = max(0.0, avg_sentiment)  # alleen positief telt mee
 
-        tech_weight = 0.7 * (1 if tech_buy else 0.5)
-        news_weight = 0.3 * max(0.2, news_res["confidence"])
+        tech_weight = _TECH_W_BASE * (1 if tech_buy else 0.5)
+        news_weight = _NEWS_W_BASE * max(_NEWS_CONF_FLOOR, news_res["confidence"])
 
         combined_score = tech_weight * tech_score + news_weight * news_score
         max_possible = tech_weight + news_weight
         normalized = combined_score / max_possible if max_possible > 0 else 0.0
 
-        signal_type = "BUY" if tech_buy and normalized >= 0.35 else "HOLD"
+        signal_type = "BUY" if tech_buy and normalized >= _BUY_THRESHOLD else "HOLD"
         confidence = normalized if signal_type == "BUY" else 0.2
 
         return {
             "signal_type": signal_type,
-            "confidence": round(confidence, 3),
+            "confidence": confidence,
             "extra": {
-                "normalized_score": round(normalized, 3),
-                "rsi": round(rsi, 2),
+                "normalized_score": normalized,
+                "rsi": rsi,
                 "news": news_res,
             },
         }
 
+    def round_meta(self, extra: Dict[str, Any]) -> Dict[str, Any]:
+        return _with_rounded_news(self.news_strategy, super().round_meta(extra))
+
 
 class NewsBreakoutCombo(BaseStrategy):
     code = "NEWS_BREAKOUT_COMBO"
     name = "News + Breakout High Momentum (20D)"
     timeframe = "1D"
 
+    __slots__ = ("news_strategy", "lookback")
+
+    meta_ndigits = {"normalized_score": 3}
+
     def __init__(
         self,
         news_strategy: NewsSentimentStrategy,
@@ -73,53 +95,59 @@ class NewsBreakoutCombo(BaseStrategy):
         self.news_strategy = news_strategy
         self.lookback = lookback
 
-    def generate_signal(self, symbol: str, candles: List[Candle]) -> StrategyResult:
-        if len(candles) < self.lookback + 1:
+    def generate_signal(self, symbol: str, ctx: TechContext) -> StrategyResult:
+        if len(ctx.candles) < self.lookback + 1:
             return {
                 "signal_type": "HOLD",
                 "confidence": 0.1,
                 "extra": {"reason": "not_enough_candles"},
             }
 
-        last = candles[-1]
-        hh = highest_high(candles[:-1], self.lookback)
-        close = last["close"]
+        hh = ctx.highest_high(self.lookback)
+        close = ctx.close
 
         tech_buy = close > hh  # breakout boven hoogste high
 
-        news_res = self.news_strategy.generate_signal(symbol, candles)
+        news_res = ctx.news(self.news_strategy, symbol)
         avg_sentiment = float(news_res["extra"].get("avg_sentiment", 0.0))
         news_score = max(0.0, avg_sentiment)
 
         tech_score = 1.0 if tech_buy else 0.0
 
-        tech_weight = 0.7 * (1 if tech_buy else 0.5)
-        news_weight = 0.3 * max(0.2, news_res["confidence"])
+        tech_weight = _TECH_W_BASE * (1 if tech_buy else 0.5)
+        news_weight = _NEWS_W_BASE * max(_NEWS_CONF_FLOOR, news_res["confidence"])
 
         combined_score = tech_weight * tech_score + news_weight * news_score
         max_possible = tech_weight + news_weight
         normalized = combined_score / max_possible if max_possible > 0 else 0.0
 
-        signal_type = "BUY" if tech_buy and normalized >= 0.35 else "HOLD"
+        signal_type = "BUY" if tech_buy and normalized >= _BUY_THRESHOLD else "HOLD"
         confidence = normalized if signal_type == "BUY" else 0.2
 
         return {
             "signal_type": signal_type,
-            "confidence": round(confidence, 3),
+            "confidence": confidence,
             "extra": {
-                "normalized_score": round(normalized, 3),
+                "normalized_score": normalized,
                 "close": close,
                 "highest_high_lookback": hh,
                 "news": news_res,
             },
         }
 
+    def round_meta(self, extra: Dict[str, Any]) -> Dict[str, Any]:
+        return _with_rounded_news(self.news_strategy, super().round_meta(extra))
+
 
 class NewsTrendMA200Combo(BaseStrategy):
     code = "NEWS_TREND_MA200_COMBO"
     name = "News + Trend MA200 Pullback"
     timeframe = "1D"
 
+    __slots__ = ("news_strategy", "ma_period", "pullback_pct")
+
+    meta_ndigits = {"normalized_score": 3, "ma200": 2, "drop_from_high": 3}
+
     def __init__(
         self,
         news_strategy: NewsSentimentStrategy,
@@ -130,55 +158,54 @@ class NewsTrendMA200Combo(BaseStrategy):
         self.ma_period = ma_period
         self.pullback_pct = pullback_pct
 
-    def generate_signal(self, symbol: str, candles: List[Candle]) -> StrategyResult:
-        if len(candles) < self.ma_period + 20:
+    def generate_signal(self, symbol: str, ctx: TechContext) -> StrategyResult:
+        if len(ctx.candles) < self.ma_period + 20:
             return {
                 "signal_type": "HOLD",
                 "confidence": 0.1,
                 "extra": {"reason": "not_enough_candles"},
             }
 
-        closes = [c["close"] for c in candles]
-        ma200 = simple_ma(closes, self.ma_period)
-        last = candles[-1]
-        close = last["close"]
+        ma200 = ctx.ma(self.ma_period)
+        recent_high = ctx.recent_high(20)
+        close = ctx.close
 
         uptrend = close > ma200
-
-        recent_closes = closes[-20:]
-        recent_high = max(recent_closes)
         drop_from_high = (recent_high - close) / recent_high if recent_high > 0 else 0.0
 
         tech_buy = uptrend and (self.pullback_pct * 0.5 <= drop_from_high <= self.pullback_pct)
 
-        news_res = self.news_strategy.generate_signal(symbol, candles)
+        news_res = ctx.news(self.news_strategy, symbol)
         avg_sentiment = float(news_res["extra"].get("avg_sentiment", 0.0))
         news_score = max(0.0, avg_sentiment)
 
         tech_score = 1.0 if tech_buy else 0.0
-        tech_weight = 0.7 * (1 if tech_buy else 0.5)
-        news_weight = 0.3 * max(0.2, news_res["confidence"])
+        tech_weight = _TECH_W_BASE * (1 if tech_buy else 0.5)
+        news_weight = _NEWS_W_BASE * max(_NEWS_CONF_FLOOR, news_res["confidence"])
 
         combined_score = tech_weight * tech_score + news_weight * news_score
         max_possible = tech_weight + news_weight
         normalized = combined_score / max_possible if max_possible > 0 else 0.0
 
-        signal_type = "BUY" if tech_buy and normalized >= 0.35 else "HOLD"
+        signal_type = "BUY" if tech_buy and normalized >= _BUY_THRESHOLD else "HOLD"
         confidence = normalized if signal_type == "BUY" else 0.2
 
         return {
             "signal_type": signal_type,
-            "confidence": round(confidence, 3),
+            "confidence": confidence,
             "extra": {
-                "normalized_score": round(normalized, 3),
-                "ma200": round(ma200, 2),
+                "normalized_score": normalized,
+                "ma200": ma200,
                 "close": close,
                 "recent_high": recent_high,
-                "drop_from_high": round(drop_from_high, 3),
+                "drop_from_high": drop_from_high,
                 "news": news_res,
             },
         }
 
+    def round_meta(self, extra: Dict[str, Any]) -> Dict[str, Any]:
+        return _with_rounded_news(self.news_strategy, super().round_meta(extra))
+
 
 def build_combined_strategies():
     """
@@ -1,28 +1,21 @@
 from __future__ import annotations
-from typing import List
 import numpy as np
 
 
-def compute_rsi(closes: List[float], period: int = 14) -> float:
+def compute_rsi(closes: np.ndarray, period: int = 14) -> float:
     """
     Simpele RSI-berekening. Geeft de laatste RSI terug.
     """
     if len(closes) < period + 1:
         return 50.0  # neutraal als er te weinig data is
 
-    arr = np.array(closes, dtype=float)
-    delta = np.diff(arr)
+    delta = np.diff(closes)
 
     gains = np.where(delta > 0, delta, 0.0)
     losses = np.where(delta < 0, -delta, 0.0)
 
-    avg_gain = gains[:period].mean()
-    avg_loss = losses[:period].mean()
-
-    # Wilder smoothing
-    for i in range(period, len(delta)):
-        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+    avg_gain = _wilder_smooth(gains, period)
+    avg_loss = _wilder_smooth(losses, period)
 
     if avg_loss == 0:
         return 100.0
@@ -32,13 +25,19 @@ def compute_rsi(closes: List[float], period: int = 14) -> float:
     return float(rsi)
 
 
-def simple_ma(values: List[float], period: int) -> float:
-    if len(values) < period:
-        return values[-1] if values else 0.0
-    return float(sum(values[-period:]) / period)
+def _wilder_smooth(values: np.ndarray, period: int) -> float:
+    """
+    Wilder smoothing (EMA met alpha = 1/period), gezaaid met de SMA van de
+    eerste `period` waarden. Alleen de laatste waarde is nodig, dus de
+    recursie avg = avg * (1 - alpha) + x * alpha wordt in gesloten vorm
+    als één gewogen som berekend, zonder Python-loop.
+    """
+    alpha = 1.0 / period
+    decay = 1.0 - alpha
+    tail = values[period:]
 
+    # gewicht van tail[j] is alpha * decay^(n-1-j); het nieuwste element weegt het zwaarst
+    weights = alpha * decay ** np.arange(len(tail) - 1, -1, -1, dtype=float)
+    seed = values[:period].mean()
+    return float(seed * decay ** len(tail) + weights @ tail)
 
-def highest_high(candles, lookback: int) -> float:
-    if len(candles) < lookback:
-        return max(c["high"] for c in candles)
-    return max(c["high"] for c in candles[-lookback:])
@@ -1,16 +1,53 @@
 from __future__ import annotations
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from datetime import datetime, timedelta, timezone
 
-from .base import BaseStrategy, StrategyResult, Candle
+import numpy as np
+from postgrest.exceptions import APIError
+
+from ._njit import njit
+from .base import BaseStrategy, StrategyResult, TechContext
 from supabase_client import supabase
 
 
+# PostgREST-foutcode als de aangeroepen functie niet bestaat
+_PGRST_FUNCTION_NOT_FOUND = "PGRST202"
+
+
+def _to_utc_datetime64_str(value: Any) -> str:
+    """
+    Supabase levert timestamps in UTC ("...Z" of "...+00:00"); numpy wil ze zonder offset.
+    """
+    if not isinstance(value, str):
+        return "NaT"
+    return value.removesuffix("Z").removesuffix("+00:00")
+
+
+@njit(cache=True)
+def _sentiment_loop(scores: np.ndarray, impacts: np.ndarray, hours_ago: np.ndarray) -> float:
+    # expliciet float64: zonder numba zouden float32-inputs de sommen anders naar float32 trekken
+    weighted_sum = np.float64(0.0)
+    weight_total = np.float64(0.0)
+
+    for i in range(scores.shape[0]):
+        recency_weight = max(0.1, 1.0 / (1.0 + hours_ago[i] / 8.0))
+
+        w = impacts[i] * recency_weight
+        weighted_sum += scores[i] * w
+        weight_total += w
+
+    return weighted_sum / weight_total if weight_total > 0 else 0.0
+
+
 class NewsSentimentStrategy(BaseStrategy):
     code = "NEWS_SENTIMENT_MOMENTUM"
     name = "News Sentiment Momentum"
     timeframe = "1D"
 
+    __slots__ = ("lookback_hours", "min_articles", "_use_rpc")
+
+    meta_ndigits = {"avg_sentiment": 3}
+
     def __init__(
         self,
         lookback_hours: int = 24,
@@ -18,12 +55,44 @@ class NewsSentimentStrategy(BaseStrategy):
     ):
         self.lookback_hours = lookback_hours
         self.min_articles = min_articles
+        # False zodra blijkt dat de agg_sentiment RPC (sql/agg_sentiment.sql)
+        # niet bestaat; dan aggregeren we zelf in Python.
+        self._use_rpc = True
+
+    def _fetch_sentiment_rpc(self, symbol: str) -> Tuple[float, int]:
+        resp = supabase.rpc(
+            "agg_sentiment",
+            {"sym": symbol, "hours": self.lookback_hours},
+        ).execute()
+        rows = resp.data or []
+        if not rows:
+            return 0.0, 0
+        return float(rows[0]["avg_sentiment"] or 0.0), int(rows[0]["articles_count"] or 0)
+
+    def _fetch_sentiment(self, symbol: str) -> Tuple[float, int]:
+        """
+        Geeft (avg_sentiment, articles_count) terug.
+        Bij voorkeur server-side via RPC, zodat er geen artikelen over de lijn gaan.
+        """
+        if self._use_rpc:
+            try:
+                return self._fetch_sentiment_rpc(symbol)
+            except APIError as e:
+                if e.code == _PGRST_FUNCTION_NOT_FOUND:
+                    print("[WARN] RPC agg_sentiment bestaat niet, fallback naar Python")
+                    self._use_rpc = False
+                else:
+                    # tijdelijke fout (timeout, 5xx): alleen deze call via Python
+                    print(f"[WARN] RPC agg_sentiment faalde voor {symbol} ({e}), fallback naar Python")
+
+        articles = self._fetch_recent_news(symbol)
+        return self._aggregate_sentiment(articles), len(articles)
 
     def _fetch_recent_news(self, symbol: str) -> List[Dict[str, Any]]:
         since = datetime.now(timezone.utc) - timedelta(hours=self.lookback_hours)
         resp = (
             supabase.table("news_articles")
-            .select("*")
+            .select("sentiment_score, impact_score, published_at")
             .eq("symbol", symbol)
             .gte("published_at", since.isoformat())
             .order("published_at", desc=True)
@@ -35,47 +104,50 @@ class NewsSentimentStrategy(BaseStrategy):
         if not articles:
             return 0.0
 
-        weighted_sum = 0.0
-        weight_total = 0.0
-        now = datetime.now(timezone.utc)
-
-        for art in articles:
-            s = float(art.get("sentiment_score") or 0.0)  # verwacht -1..1
-            impact = float(art.get("impact_score") or 0.5)
-
-            published_at_str = art.get("published_at")
-            if isinstance(published_at_str, str):
-                published_at = datetime.fromisoformat(published_at_str.replace("Z", "+00:00"))
-            else:
-                published_at = now
+        # sentiment (-1..1 uit een LLM) heeft geen float64-precisie nodig;
+        # float32 halveert het geheugenverkeer in de aggregatie
+        n = len(articles)
+        scores = np.fromiter(
+            (float(art.get("sentiment_score") or 0.0) for art in articles),  # verwacht -1..1
+            dtype=np.float32,
+            count=n,
+        )
+        impacts = np.fromiter(
+            (float(art.get("impact_score") or 0.5) for art in articles),
+            dtype=np.float32,
+            count=n,
+        )
 
-            hours_ago = (now - published_at).total_seconds() / 3600.0
-            recency_weight = max(0.1, 1.0 / (1.0 + hours_ago / 8.0))
+        # datetime kan niet door numba heen: alle tijdstippen in één keer
+        # naar datetime64 (UTC) en hours_ago gevectoriseerd uitrekenen
+        published_at = np.array(
+            [_to_utc_datetime64_str(art.get("published_at")) for art in articles],
+            dtype="datetime64[us]",
+        )
+        now = np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None), "us")
 
-            w = impact * recency_weight
-            weighted_sum += s * w
-            weight_total += w
+        hours_ago = ((now - published_at) / np.timedelta64(1, "h")).astype(np.float32)
+        hours_ago[np.isnat(published_at)] = 0.0  # geen tijdstip -> telt als "nu"
 
-        return weighted_sum / weight_total if weight_total > 0 else 0.0
+        return float(_sentiment_loop(scores, impacts, hours_ago))
 
-    def generate_signal(self, symbol: str, candles: List[Candle]) -> StrategyResult:
+    def generate_signal(self, symbol: str, ctx: TechContext) -> StrategyResult:
         """
         Deze wordt alleen intern gebruikt door de combinaties.
         """
-        articles = self._fetch_recent_news(symbol)
+        avg_sentiment, articles_count = self._fetch_sentiment(symbol)  # -1..1
 
-        if len(articles) < self.min_articles:
+        if articles_count < self.min_articles:
             return {
                 "signal_type": "HOLD",
                 "confidence": 0.1,
                 "extra": {
                     "reason": "not_enough_news",
-                    "articles_count": len(articles),
+                    "articles_count": articles_count,
                     "avg_sentiment": 0.0,
                 },
             }
 
-        avg_sentiment = self._aggregate_sentiment(articles)  # -1..1
         confidence = min(1.0, max(0.0, abs(avg_sentiment)))
 
         # JIJ WILT GEEN SELL:
@@ -88,9 +160,9 @@ class NewsSentimentStrategy(BaseStrategy):
 
         return {
             "signal_type": signal_type,
-            "confidence": round(confidence, 3),
+            "confidence": confidence,
             "extra": {
-                "avg_sentiment": round(avg_sentiment, 3),
-                "articles_count": len(articles),
+                "avg_sentiment": avg_sentiment,
+                "articles_count": articles_count,
             },
         }
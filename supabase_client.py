@@ -3,7 +3,9 @@ load_dotenv()
 
 # supabase_client.py
 import os
-from supabase import create_client, Client
+
+import httpx
+from supabase import create_client, Client, ClientOptions
 
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_SERVICE_ROLE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
@@ -11,4 +13,20 @@ SUPABASE_SERVICE_ROLE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
 if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
     raise RuntimeError("SUPABASE_URL of SUPABASE_SERVICE_ROLE_KEY mist in environment variables")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+HTTP_TIMEOUT_SECONDS = 30.0
+
+# Eén gedeelde connection pool (keep-alive + HTTP/2), zodat de vele requests
+# per run niet elk opnieuw een TCP/TLS-handshake betalen. Ruim boven
+# DEFAULT_MAX_CONCURRENCY in run_strategies.py. De timeout staat hier: met een
+# eigen httpx_client negeert supabase-py postgrest_client_timeout.
+_http_client = httpx.Client(
+    http2=True,
+    timeout=HTTP_TIMEOUT_SECONDS,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+)
+
+supabase: Client = create_client(
+    SUPABASE_URL,
+    SUPABASE_SERVICE_ROLE_KEY,
+    options=ClientOptions(httpx_client=_http_client),
+)